@@ -1,19 +1,26 @@
 #!/usr/bin/env python3
 """
 Grid harmonization module for SkyWell.
-Reprojects CAMS and Sentinel-3 data to a common 0.01° grid and saves as COG files.
+Reprojects CAMS and Sentinel-3 data to a common 0.01° grid, stores it per date
+as Zarr and exports COG files for delivery.
 """
 
 import xarray as xr
-import rioxarray as rio
+import rasterio
+from rasterio.transform import from_origin
 import numpy as np
 from pathlib import Path
-from datetime import datetime, timedelta
-import zipfile
-import tempfile
-import shutil
+from datetime import datetime
+from functools import lru_cache
+import os
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 # import cfgrib # Commented out as not needed for NetCDF
 
+# Let GDAL use every core for compression and decoding unless the caller configured it
+os.environ.setdefault('GDAL_NUM_THREADS', 'ALL_CPUS')
+
 # Constants
 GRID_RESOLUTION = 0.01  # degrees
 BERLIN_BOUNDS = {
@@ -22,33 +29,231 @@ BERLIN_BOUNDS = {
     'east': 13.85,
     'west': 13.05
 }
+# Interpolation scratch buffers; variables are processed on several threads
+_thread_buffers = threading.local()
 
+@lru_cache(maxsize=1)
 def create_target_grid():
-    """Create a target grid for Berlin with 0.01° resolution."""
+    """Create a target grid for Berlin with 0.01° resolution.
+
+    The grid is built once and shared, so the returned arrays are read-only.
+    """
     lats = np.arange(BERLIN_BOUNDS['south'], BERLIN_BOUNDS['north'] + GRID_RESOLUTION, GRID_RESOLUTION)
     lons = np.arange(BERLIN_BOUNDS['west'], BERLIN_BOUNDS['east'] + GRID_RESOLUTION, GRID_RESOLUTION)
+    lats.setflags(write=False)
+    lons.setflags(write=False)
     print(f"Created target grid with dimensions: {len(lats)}x{len(lons)}")
     return lats, lons
 
+@lru_cache(maxsize=1)
+def create_target_transform():
+    """Affine transform of the north-up Berlin target grid, shared by every COG."""
+    lats, lons = create_target_grid()
+    # Grid coordinates are cell centres; the transform anchors on the north-west cell corner
+    return from_origin(
+        lons[0] - GRID_RESOLUTION / 2,
+        lats[-1] + GRID_RESOLUTION / 2,
+        GRID_RESOLUTION,
+        GRID_RESOLUTION
+    )
+
+def crop_to_bounds(ds):
+    """Crop a dataset to BERLIN_BOUNDS plus a one-cell halo of the source grid.
+
+    The halo keeps the source cells surrounding the Berlin edges so linear
+    interpolation at the border is unaffected by the crop.
+    """
+    # Global products use 0..360 longitudes; shift them to -180..180 so the slice is contiguous
+    if float(ds.longitude.max()) > 180:
+        ds = ds.assign_coords(longitude=(((ds.longitude + 180) % 360) - 180)).sortby('longitude')
+
+    lats = ds.latitude.values
+    lons = ds.longitude.values
+    lat_halo = abs(float(lats[1] - lats[0])) if len(lats) > 1 else GRID_RESOLUTION
+    lon_halo = abs(float(lons[1] - lons[0])) if len(lons) > 1 else GRID_RESOLUTION
+
+    lat_slice = slice(BERLIN_BOUNDS['south'] - lat_halo, BERLIN_BOUNDS['north'] + lat_halo)
+    if lats[0] > lats[-1]:
+        lat_slice = slice(lat_slice.stop, lat_slice.start)
+    lon_slice = slice(BERLIN_BOUNDS['west'] - lon_halo, BERLIN_BOUNDS['east'] + lon_halo)
+    if lons[0] > lons[-1]:
+        lon_slice = slice(lon_slice.stop, lon_slice.start)
+
+    return ds.sel(latitude=lat_slice, longitude=lon_slice)
+
+def load_decoded(data):
+    """Load a DataArray opened with decode_cf=False and apply its CF fill/scale attributes.
+
+    Only the requested slab is read from disk, and decoding is a single numpy
+    pass instead of xarray's per-variable CF machinery.
+    """
+    raw = data.values
+    decoded = raw.astype(np.result_type(raw.dtype, np.float32))
+
+    fill_value = data.attrs.get('_FillValue', data.attrs.get('missing_value'))
+    if fill_value is not None:
+        decoded[raw == fill_value] = np.nan
+    if 'scale_factor' in data.attrs or 'add_offset' in data.attrs:
+        decoded = decoded * data.attrs.get('scale_factor', 1) + data.attrs.get('add_offset', 0)
+
+    return data.copy(data=decoded)
+
+def axis_weights(source_coords, target_coords):
+    """Bilinear weights along one axis of a regular grid.
+
+    Returns, for every target coordinate, the index of the source cell below it,
+    the fractional distance towards the next source cell, and whether the target
+    lies inside the source range at all.
+    """
+    source_coords = np.asarray(source_coords, dtype=np.float64)
+    target_coords = np.asarray(target_coords, dtype=np.float64)
+    last = len(source_coords) - 2
+
+    index = np.searchsorted(source_coords, target_coords, side='right') - 1
+    # A target exactly on the last source coordinate interpolates within the last cell
+    index[target_coords == source_coords[-1]] = last
+    valid = (index >= 0) & (index <= last)
+    index = np.clip(index, 0, last)
+
+    weight = (target_coords - source_coords[index]) / (source_coords[index + 1] - source_coords[index])
+    # float32 weights keep float32 sources from being upcast during regridding
+    return index, weight.astype(np.float32), valid
+
+def grid_weights(source_lats, source_lons, target_lats, target_lons):
+    """Bilinear weights from a regular source grid (in ascending order) onto the target grid.
+
+    Source and target are both regular latitude/longitude grids, so bilinear
+    regridding separates into two 1D linear interpolations whose weights only
+    depend on the coordinates and can be shared by every variable.
+    """
+    return (
+        axis_weights(np.sort(source_lats), target_lats),
+        axis_weights(np.sort(source_lons), target_lons)
+    )
+
+@lru_cache(maxsize=8)
+def _berlin_grid_weights(source_lats, source_lons):
+    weights = grid_weights(np.array(source_lats), np.array(source_lons), *create_target_grid())
+    for axis in weights:
+        for table in axis:
+            table.setflags(write=False)
+    return weights
+
+def berlin_grid_weights(source_lats, source_lons):
+    """grid_weights onto the Berlin target grid, memoised per source grid.
+
+    Every CAMS product is delivered on a fixed source grid, so its weight
+    tables are computed once per process and shared read-only afterwards.
+    """
+    return _berlin_grid_weights(tuple(np.asarray(source_lats).tolist()), tuple(np.asarray(source_lons).tolist()))
+
+def bilinear_regrid(values, weights, out=None):
+    """Apply precomputed grid_weights to a 2D array in ascending latitude/longitude order.
+
+    The result is written into `out` when a (ny, nx) buffer is given.
+    """
+    (i0, wlat, lat_valid), (j0, wlon, lon_valid) = weights
+
+    # Interpolate along latitude first, then along longitude
+    rows = values[i0] * (1 - wlat)[:, np.newaxis] + values[i0 + 1] * wlat[:, np.newaxis]
+    if out is None:
+        out = np.empty((len(i0), len(j0)), dtype=rows.dtype)
+    np.multiply(rows[:, j0], 1 - wlon, out=out)
+    out += rows[:, j0 + 1] * wlon
+
+    # Targets outside the source grid are not extrapolated
+    out[~lat_valid, :] = np.nan
+    out[:, ~lon_valid] = np.nan
+    return out
+
+def interpolate_to_grid(data, target_lats, target_lons, weights=None, out=None):
+    """Bilinearly interpolate a 2D latitude/longitude DataArray onto the target grid.
+
+    `weights` may be passed in from grid_weights to share them between variables
+    on the same source grid, and `out` is an optional scratch buffer for the
+    result; the returned DataArray always owns a copy.
+    """
+    lats = data.latitude.values
+    lons = data.longitude.values
+    values = data.transpose('latitude', 'longitude').values
+
+    # The weights assume ascending coordinates; CAMS latitudes run north to south
+    if lats[0] > lats[-1]:
+        values = values[::-1, :]
+    if lons[0] > lons[-1]:
+        values = values[:, ::-1]
+
+    if weights is None:
+        weights = grid_weights(lats, lons, target_lats, target_lons)
+
+    interpolated = bilinear_regrid(values, weights, out)
+    # Outputs are written as float32: the CAMS sources carry no more precision than that
+    interpolated = interpolated.astype(np.float32, copy=out is not None)
+
+    return xr.DataArray(
+        interpolated,
+        coords={'latitude': target_lats, 'longitude': target_lons},
+        dims=['latitude', 'longitude'],
+        name=data.name
+    )
+
+def cog_block_size(shape):
+    """Smallest COG tile size (a power of two, 16 to 512) that holds the raster in one block.
+
+    The Berlin grid is far smaller than GDAL's default 512 px tile, so a single
+    right-sized block avoids padding and extra tile directory entries.
+    """
+    block_size = 16
+    while block_size < max(shape) and block_size < 512:
+        block_size *= 2
+    return block_size
+
+def cog_options(dtype, shape):
+    """COG creation options: ZSTD with a predictor matched to the data type, encoded on all cores."""
+    return {
+        'driver': 'COG',
+        'compress': 'ZSTD',
+        'level': 9,
+        'predictor': 3 if np.issubdtype(dtype, np.floating) else 2,
+        'num_threads': 'ALL_CPUS',
+        'blocksize': cog_block_size(shape),
+        'overview_resampling': 'AVERAGE',
+        'bigtiff': 'IF_SAFER'
+    }
+
+def _array_stats(values):
+    """Return (has_nan, all_zero, min, max) for an array.
+
+    min and max propagate NaN, so a clean array needs only those two reductions;
+    the NaN-aware ones run only when NaNs are actually present.
+    """
+    values = np.asarray(values)
+    value_min, value_max = values.min(), values.max()
+    has_nan = bool(np.isnan(value_min))
+    if has_nan:
+        value_min, value_max = np.nanmin(values), np.nanmax(values)
+    all_zero = not has_nan and value_min == 0 and value_max == 0
+    return has_nan, all_zero, value_min, value_max
+
 def validate_interpolation(source_data, interpolated_data, var_name):
     """Validate interpolation results."""
+    source_has_nan, source_all_zero, source_min, source_max = _array_stats(source_data)
+    interp_has_nan, interp_all_zero, interp_min, interp_max = _array_stats(interpolated_data)
     # Print ranges for debugging (keep for diagnostics if needed)
-    source_min, source_max = np.nanmin(source_data), np.nanmax(source_data)
-    interp_min, interp_max = np.nanmin(interpolated_data), np.nanmax(interpolated_data)
     print(f"Debug Validation - {var_name}: Source range ({source_min:.5f}, {source_max:.5f}), Interpolated range ({interp_min:.5f}, {interp_max:.5f})")
 
     # Check for NaN values in interpolated data
-    if np.any(np.isnan(interpolated_data)):
+    if interp_has_nan:
         print(f"Warning: Interpolated {var_name} contains NaN values!")
         return False
     
     # Check for all zeros in interpolated data:
     # If source is all zeros, interpolated should also be all zeros (and pass)
-    if np.all(source_data == 0):
-        return np.all(interpolated_data == 0)
+    if source_all_zero:
+        return interp_all_zero
 
     # If source is NOT all zeros, but interpolated IS all zeros, then it's a failure
-    if np.all(interpolated_data == 0) and not np.all(source_data == 0):
+    if interp_all_zero:
         print(f"Warning: Interpolated {var_name} contains all zeros but source data does not!")
         return False
     
@@ -56,122 +261,165 @@ def validate_interpolation(source_data, interpolated_data, var_name):
     # We are now trusting the interpolation if it produces valid non-zero values.
     return True
 
-def extract_cams_netcdf(zip_path):
-    """Extract the NetCDF file from the CAMS zip archive and copy it to raw/ for persistence."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(tmpdir)
-            # Find the .nc file in the extracted contents
-            nc_files = list(Path(tmpdir).glob('*.nc'))
-            if not nc_files:
-                raise ValueError(f"No NetCDF file found in {zip_path}")
-            extracted_nc = nc_files[0]
-            # Copy the extracted file to raw/ for persistence
-            persistent_nc = Path('raw') / extracted_nc.name
-            shutil.copy(extracted_nc, persistent_nc)
-            return persistent_nc
-
-def process_cams_data(zip_path, date):
-    """Process CAMS data and save individual variables as COG files."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Extract the NetCDF file
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(tmpdir)
-            # Find the .nc file in the extracted contents
-            nc_files = list(Path(tmpdir).glob('*.nc'))
-            if not nc_files:
-                raise ValueError(f"No NetCDF file found in {zip_path}")
-            nc_path = nc_files[0]
-            
-            # Open and process the NetCDF file within the temporary directory context
-            ds = xr.open_dataset(nc_path, engine='netcdf4')
-            print(f"Source data dimensions: {ds.dims}")
-            
-            # Create target grid
-            target_lats, target_lons = create_target_grid()
-            
-            # Process each variable
-            for var in ds.data_vars:
-                # Skip non-environmental variables
-                if var in ['longitude', 'latitude', 'time']:
-                    continue
-                    
-                print(f"\nProcessing {var}...")
-                # Get the data for the first time step (current forecast)
-                data = ds[var].isel(time=0)
-
-                print(f"Source data shape: {data.shape}")
-                if np.any(np.isnan(data.values)):
-                    print(f"Warning: Source data for {var} contains NaN values before interpolation!")
-                
-                # Create a template DataArray for interpolation
-                template_da = xr.DataArray(
-                    np.empty((len(target_lats), len(target_lons))),
-                    coords={'latitude': target_lats, 'longitude': target_lons},
-                    dims=['latitude', 'longitude']
-                )
-                
-                # Interpolate to target grid using interp_like
-                target_data = data.interp_like(template_da, method='linear')
-                
-                # Assign the interpolated data to the target dataset
-                target_ds = xr.Dataset(
-                    coords={
-                        'latitude': target_lats,
-                        'longitude': target_lons
-                    }
-                )
-                
-                # Assign the interpolated data to the target dataset
-                target_ds[var] = target_data
-                
-                # Validate interpolation
-                if not validate_interpolation(data.values, target_ds[var].values, var):
-                    print(f"Skipping {var} due to validation failure")
-                    continue
-                
-                # Save as COG
-                output_path = Path('data') / f"{date}_{var}.tif"
-                output_path.parent.mkdir(exist_ok=True)
-                
-                # Convert to rioxarray and save as COG
-                target_ds[var].rio.to_raster(
-                    output_path,
-                    driver='COG',
-                    compress='LZW'
-                )
-                
-                print(f"Saved {var} to {output_path}")
-            
-            # Close the dataset to free up resources
-            ds.close()
-
-def process_cams_global_uvi_data(grib_path, date):
-    """Process CAMS Global UVI data from GRIB and save as COG file."""
+def open_cams_netcdf(nc_path):
+    """Open a CAMS NetCDF file lazily and without CF decoding."""
+    decode_kwargs = {'decode_cf': False, 'decode_times': False, 'mask_and_scale': False}
+    return xr.open_dataset(nc_path, engine='netcdf4', **decode_kwargs)
+
+def zarr_store_path(date):
+    """Path of the Zarr store holding every interpolated variable for a date."""
+    return Path('data') / f"{date}.zarr"
+
+def write_zarr(target_ds, date):
+    """Add the variables of target_ds to the date's Zarr store, replacing any existing ones."""
+    store_path = zarr_store_path(date)
+    store_path.parent.mkdir(exist_ok=True)
+    target_ds.to_zarr(store_path, mode='a', consolidated=True)
+    print(f"Saved {list(target_ds.data_vars)} to {store_path}")
+
+def cog_path(date, var):
+    """Path of the delivered COG file for a variable on a date."""
+    return Path('data') / f"{date}_{var}.tif"
+
+def is_up_to_date(output_path, input_path):
+    """Whether output_path exists and was written after input_path last changed."""
+    output_path = Path(output_path)
+    return output_path.exists() and output_path.stat().st_mtime > Path(input_path).stat().st_mtime
+
+def _output_buffer(shape):
+    """Per-thread float32 buffer for interpolation results, reused across variables."""
+    buffer = getattr(_thread_buffers, 'out', None)
+    if buffer is None or buffer.shape != shape:
+        buffer = _thread_buffers.out = np.empty(shape, dtype=np.float32)
+    return buffer
+
+def _process_one_var(ds, var, target_lats, target_lons, weights):
+    """Interpolate a single CAMS variable to the target grid.
+
+    Returns the interpolated DataArray, or None if it fails validation.
+    """
+    print(f"\nProcessing {var}...")
+    # Get the data for the first time step (current forecast), dropping the singleton level
+    data = load_decoded(ds[var].isel(time=0).squeeze(drop=True))
+
+    print(f"Source data shape: {data.shape}")
+    if np.any(np.isnan(data.values)):
+        print(f"Warning: Source data for {var} contains NaN values before interpolation!")
+    
+    # Interpolate to target grid
+    out = _output_buffer((len(target_lats), len(target_lons)))
+    target_data = interpolate_to_grid(data, target_lats, target_lons, weights, out)
+    
+    # Validate interpolation
+    if not validate_interpolation(data.values, target_data.values, var):
+        print(f"Skipping {var} due to validation failure")
+        return None
+    
+    return target_data.rename(var)
+
+def interpolate_cams_data(nc_path, date, force=False):
+    """Interpolate every CAMS variable in the NetCDF file to the target grid.
+
+    Variables whose COG for `date` is newer than the file are skipped unless
+    `force` is set; they keep their previous values in the Zarr store.
+    Returns a Dataset holding the variables that passed validation.
+    """
+    # Open lazily and without CF decoding; only the slab we need is loaded and decoded
+    ds = open_cams_netcdf(nc_path)
+    print(f"Source data dimensions: {ds.dims}")
+    # Only the cells around Berlin are needed for interpolation
+    ds = crop_to_bounds(ds)
+    
+    # Create target grid
+    target_lats, target_lons = create_target_grid()
+    # Every variable shares the same source grid, so the bilinear weights are computed once
+    weights = berlin_grid_weights(ds.latitude.values, ds.longitude.values)
+    
+    # Skip non-environmental variables
+    variables = [var for var in ds.data_vars if var not in ['longitude', 'latitude', 'time']]
+    if not force:
+        up_to_date = [var for var in variables if is_up_to_date(cog_path(date, var), nc_path)]
+        if up_to_date:
+            print(f"Skipping up-to-date variables: {', '.join(up_to_date)}")
+        variables = [var for var in variables if var not in up_to_date]
+    
+    # Variables are independent, so interpolate them concurrently;
+    # NumPy releases the GIL for the heavy lifting
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = [
+            executor.submit(_process_one_var, ds, var, target_lats, target_lons, weights)
+            for var in variables
+        ]
+        results = [future.result() for future in futures]
+    
+    # Close the dataset to free up resources
+    ds.close()
+    
+    # Collect every valid variable into one dataset on the target grid
+    return xr.Dataset(
+        {da.name: da for da in results if da is not None},
+        coords={
+            'latitude': target_lats,
+            'longitude': target_lons
+        }
+    )
+
+def process_cams_data(nc_path, date, force=False):
+    """Process CAMS data and save the interpolated variables to the date's Zarr store."""
+    target_ds = interpolate_cams_data(nc_path, date, force)
+    if target_ds.data_vars:
+        write_zarr(target_ds, date)
+
+def interpolate_cams_global_uvi_data(grib_path, date, force=False):
+    """Interpolate CAMS Global UVI data from GRIB to the target grid.
+
+    Skipped when the UVI COG for `date` is newer than the GRIB file, unless
+    `force` is set. Returns a Dataset holding the UV dose, or None if it was
+    skipped or could not be processed.
+    """
+    if not force and is_up_to_date(cog_path(date, 'uv_biologically_effective_dose'), grib_path):
+        print(f"UVI data for {date} is up to date, skipping {grib_path}")
+        return None
+
     print(f"Processing UVI data from {grib_path}...")
     try:
-        # Open the GRIB file using xarray with the cfgrib engine
-        ds = xr.open_dataset(grib_path, engine='cfgrib')
+        # Open the GRIB file using xarray with the cfgrib engine. The index is kept
+        # next to the raw file so reruns skip the scan, and only the first step of
+        # the UV field is decoded.
+        ds = xr.open_dataset(
+            grib_path,
+            engine='cfgrib',
+            backend_kwargs={
+                'indexpath': f"{grib_path}.idx",
+                'filter_by_keys': {'shortName': 'uvbed', 'stepRange': '0'}
+            }
+        )
         print(f"Source UVI data dimensions: {ds.dims}")
+        # Only the cells around Berlin are needed for interpolation
+        ds = crop_to_bounds(ds)
 
         # The variable name for UV biologically effective dose is 'uvbed' in the GRIB file
-        uvi_data = ds['uvbed'].isel(step=0)
+        uvi_data = ds['uvbed']
+        # cfgrib drops the step dimension when the filter leaves a single step
+        if 'step' in uvi_data.dims:
+            uvi_data = uvi_data.isel(step=0)
         print(f"Source UVI data shape: {uvi_data.shape}")
 
         # Create target grid
         target_lats, target_lons = create_target_grid()
 
         # Interpolate to target grid
-        uvi_interpolated = uvi_data.interp(
-            latitude=target_lats,
-            longitude=target_lons,
-            method='linear'
+        uvi_interpolated = interpolate_to_grid(
+            uvi_data,
+            target_lats,
+            target_lons,
+            berlin_grid_weights(uvi_data.latitude.values, uvi_data.longitude.values)
         )
 
         # Validate interpolation
         if not validate_interpolation(uvi_data.values, uvi_interpolated.values, 'uv_biologically_effective_dose'):
             print("Skipping UVI data due to validation failure")
-            return
+            return None
 
         # Create a new DataArray with the target grid
         target_da = xr.DataArray(
@@ -181,22 +429,74 @@ def process_cams_global_uvi_data(grib_path, date):
             name='uv_biologically_effective_dose'
         )
 
-        # Convert to rioxarray and save as COG
-        output_path = Path('data') / f"{date}_uv_biologically_effective_dose.tif"
-        output_path.parent.mkdir(exist_ok=True)
-
-        target_da.rio.to_raster(
-            output_path,
-            driver='COG',
-            compress='LZW'
-        )
-
-        print(f"Saved UVI data to {output_path}")
-
         ds.close()
 
+        return target_da.to_dataset()
+
     except Exception as e:
         print(f"Error processing UVI data: {e}")
+        return None
+
+def process_cams_global_uvi_data(grib_path, date, force=False):
+    """Process CAMS Global UVI data from GRIB and save it to the date's Zarr store."""
+    target_ds = interpolate_cams_global_uvi_data(grib_path, date, force)
+    if target_ds is not None:
+        write_zarr(target_ds, date)
+
+def _north_up(da):
+    """Values of a DataArray on the target grid with rows running north to south, as GeoTIFF expects."""
+    values = da.transpose('latitude', 'longitude').values
+    if da.latitude.values[0] < da.latitude.values[-1]:
+        values = values[::-1, :]
+    return values
+
+def _write_cog(output_path, bands, descriptions):
+    """Save a (bands, ny, nx) array on the target grid as a COG file with named bands."""
+    with rasterio.open(
+        output_path,
+        'w',
+        height=bands.shape[1],
+        width=bands.shape[2],
+        count=bands.shape[0],
+        dtype=bands.dtype,
+        crs='EPSG:4326',
+        transform=create_target_transform(),
+        **cog_options(bands.dtype, bands.shape[1:])
+    ) as dst:
+        dst.write(bands)
+        dst.descriptions = tuple(descriptions)
+    print(f"Saved {', '.join(descriptions)} to {output_path}")
+
+def export_cogs(date):
+    """Export the date's Zarr store as COG files for delivery.
+
+    Every variable gets its own single-band COG, and all of them are also
+    written as the bands of one stacked COG so consumers that need every
+    variable pay for a single open.
+    """
+    store_path = zarr_store_path(date)
+    if not store_path.exists():
+        raise ValueError(f"No Zarr store found for date {date}: {store_path}")
+
+    ds = xr.open_dataset(store_path, engine='zarr', consolidated=True).load()
+    variables = list(ds.data_vars)
+    bands = {var: _north_up(ds[var]) for var in variables}
+    ds.close()
+
+    # COG writes are independent and GDAL releases the GIL while compressing
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = [
+            executor.submit(_write_cog, cog_path(date, var), bands[var][np.newaxis], [var])
+            for var in variables
+        ]
+        futures.append(executor.submit(
+            _write_cog,
+            cog_path(date, 'stack'),
+            np.stack([bands[var] for var in variables]),
+            variables
+        ))
+        for future in futures:
+            future.result()
 
 def process_sentinel3_data(zip_path, date):
     """Process Sentinel-3 UV data and save as COG file."""
@@ -205,46 +505,69 @@ def process_sentinel3_data(zip_path, date):
 
 def load_grid(date):
     """Load all variables for a given date into a dictionary of numpy arrays."""
-    data_dir = Path('data')
     date_str = date.strftime('%Y-%m-%d')
+    store_path = zarr_store_path(date_str)
     
-    # Find all files for this date
-    files = list(data_dir.glob(f"{date_str}_*.tif"))
-    
-    if not files:
+    if not store_path.exists():
         raise ValueError(f"No data found for date {date_str}")
     
-    # Load each file into a dictionary
+    # A single open serves every variable
+    ds = xr.open_dataset(store_path, engine='zarr', consolidated=True)
     grid_data = {}
-    for file in files:
-        var_name = file.stem.split('_', 1)[1]  # Get variable name from filename
-        ds = rio.open_rasterio(file)
-        grid_data[var_name] = ds.values[0]  # Get first band
+    for var_name in ds.data_vars:
+        grid_data[var_name] = ds[var_name].values
         print(f"Loaded {var_name} with shape {grid_data[var_name].shape}")
+    ds.close()
     
     return grid_data
 
-def main():
+def main(argv=None):
     """Main function to process today's data."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help="Reprocess inputs even when their outputs are newer"
+    )
+    args = parser.parse_args(argv)
+
     today = datetime.utcnow().date()
     date_str = today.strftime('%Y-%m-%d')
     
-    # Process CAMS air quality and pollen data (NetCDF)
-    cams_zip = Path('raw') / f"{date_str}_cams_air_quality.nc.zip"
-    if cams_zip.exists():
-        process_cams_data(cams_zip, date_str)
-    else:
-        print(f"CAMS air quality and pollen data not found: {cams_zip}")
-
-    # Process CAMS Global UVI data (GRIB)
-    # uvi_grib = Path('raw') / f"{date_str}_cams_atmos_composition.grib"
-    # if uvi_grib.exists():
-    #     process_cams_global_uvi_data(uvi_grib, date_str)
-    # else:
-    #     print(f"CAMS Global UVI data not found: {uvi_grib}")
+    cams_nc = Path('raw') / f"{date_str}_cams_air_quality.nc"
+    uvi_grib = Path('raw') / f"{date_str}_cams_atmos_composition.grib"
+    
+    # CAMS (NetCDF) and UVI (GRIB) read disjoint inputs, so interpolate them in
+    # separate processes where the HDF5 and ecCodes globals don't contend
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        futures = []
+        
+        # Process CAMS air quality and pollen data (NetCDF)
+        if cams_nc.exists():
+            futures.append(executor.submit(interpolate_cams_data, cams_nc, date_str, args.force))
+        else:
+            print(f"CAMS air quality and pollen data not found: {cams_nc}")
+        
+        # Process CAMS Global UVI data (GRIB)
+        if uvi_grib.exists():
+            futures.append(executor.submit(interpolate_cams_global_uvi_data, uvi_grib, date_str, args.force))
+        else:
+            print(f"CAMS Global UVI data not found: {uvi_grib}")
+        
+        results = [future.result() for future in futures]
+    
+    # Both share the target grid; write them to the Zarr store in a single pass
+    datasets = [ds for ds in results if ds is not None and ds.data_vars]
+    if datasets:
+        write_zarr(xr.merge(datasets), date_str)
 
     # Note: Sentinel-3 UV data processing is removed as we are using CAMS UVI.
     # The placeholder function process_sentinel3_data remains but does nothing.
 
+    # COGs are only produced as the final delivery artifact, from the Zarr store;
+    # when every input was up to date they already match it
+    if datasets or (args.force and zarr_store_path(date_str).exists()):
+        export_cogs(date_str)
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
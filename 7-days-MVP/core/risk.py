@@ -15,10 +15,10 @@ from pathlib import Path
 import math
 from datetime import datetime, timedelta
 import logging
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 from typing_extensions import TypedDict
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class HealthProfile(Enum):
@@ -269,6 +269,10 @@ VARIABLE_TIMING: Dict[EnvironmentalVariable, VariableTimingConfig] = {
     }
 }
 
+# Averaging period in hours for each peak-detection window
+WINDOW_HOURS = {'instant': 1, '8h': 8, '24h': 24}
+NS_PER_HOUR = 3600 * 10**9
+
 # Pollen cross-reactivity groups
 POLLEN_GROUPS = {
     'BETULACEAE': [EnvironmentalVariable.BIRCH_POLLEN, EnvironmentalVariable.ALDER_POLLEN],
@@ -276,6 +280,70 @@ POLLEN_GROUPS = {
     'GRASS': [EnvironmentalVariable.GRASS_POLLEN],
     'OLIVE': [EnvironmentalVariable.OLIVE_POLLEN]
 }
+POLLEN_MEMBERS = frozenset(p for group in POLLEN_GROUPS.values() for p in group)
+
+# Pollen types packed group by group, with the offset of each group for reduceat
+POLLEN_ORDER = tuple(p for group in POLLEN_GROUPS.values() for p in group)
+POLLEN_GROUP_SEGMENTS = np.cumsum([0] + [len(group) for group in POLLEN_GROUPS.values()][:-1])
+POLLEN_SAFE = np.array([THRESHOLDS[p]['safe'] for p in POLLEN_ORDER], dtype=np.float64)
+POLLEN_DANGER = np.array([THRESHOLDS[p]['danger'] for p in POLLEN_ORDER], dtype=np.float64)
+
+# Canonical variable order used for packed per-variable arrays
+ALL_VARIABLES = tuple(EnvironmentalVariable)
+_VARIABLE_INDEX = {var: i for i, var in enumerate(ALL_VARIABLES)}
+DANGER = np.array([THRESHOLDS[var]['danger'] for var in ALL_VARIABLES], dtype=np.float64)
+
+@dataclass(frozen=True)
+class _ProfileTable:
+    """
+    Struct-of-arrays view of profile weights and thresholds, aligned by driver.
+    
+    Arrays are 1-D for a single profile, or 2-D with one row per profile in
+    PROFILE_ORDER, where shorter profiles are padded with zero-weight drivers.
+    """
+    var_idx: np.ndarray  # Position of each driver in ALL_VARIABLES
+    weights: np.ndarray
+    safe: np.ndarray
+    span: np.ndarray  # danger - safe
+    hazard_scale: np.ndarray
+    is_pollen: np.ndarray
+    is_driver: np.ndarray  # False for padding
+
+def _build_profile_table(profile: HealthProfile, width: Optional[int] = None) -> _ProfileTable:
+    """Pack a profile's weights and thresholds into aligned arrays, padded to width drivers."""
+    weights = HEALTH_PROFILES[profile].weights
+    variables = list(weights)
+    padding = (width or len(variables)) - len(variables)
+    is_pollen = np.array([var in POLLEN_MEMBERS for var in variables] + [False] * padding)
+    # For asthma child, use more conservative thresholds (pollen excluded)
+    scale = 1.2 if profile == HealthProfile.ASTHMA_CHILD else 1.0
+    return _ProfileTable(
+        var_idx=np.array([_VARIABLE_INDEX[var] for var in variables] + [0] * padding, dtype=np.intp),
+        weights=np.array([weights[var] for var in variables] + [0.0] * padding, dtype=np.float64),
+        safe=np.array([THRESHOLDS[var]['safe'] for var in variables] + [0.0] * padding, dtype=np.float64),
+        span=np.array(
+            [THRESHOLDS[var]['danger'] - THRESHOLDS[var]['safe'] for var in variables] + [1.0] * padding,
+            dtype=np.float64
+        ),
+        hazard_scale=np.where(is_pollen, 1.0, scale),
+        is_pollen=is_pollen,
+        is_driver=np.arange(len(is_pollen)) < len(variables)
+    )
+
+PROFILE_ORDER = tuple(HEALTH_PROFILES)
+_PROFILE_VARIABLES = {profile: tuple(HEALTH_PROFILES[profile].weights) for profile in PROFILE_ORDER}
+_PROFILE_TABLES = {profile: _build_profile_table(profile) for profile in PROFILE_ORDER}
+
+def _stack_profile_tables() -> _ProfileTable:
+    """Stack every profile table into one padded 2-D table, one row per profile."""
+    width = max(len(variables) for variables in _PROFILE_VARIABLES.values())
+    tables = [_build_profile_table(profile, width) for profile in PROFILE_ORDER]
+    return _ProfileTable(**{
+        name: np.stack([getattr(table, name) for table in tables])
+        for name in _ProfileTable.__dataclass_fields__
+    })
+
+_ALL_PROFILES_TABLE = _stack_profile_tables()
 
 @dataclass
 class TimeWindow:
@@ -319,15 +387,20 @@ def validate_data(data: xr.DataArray, var: EnvironmentalVariable) -> None:
     Raises:
         InvalidDataError: If data contains invalid values
     """
-    if np.any(np.isnan(data)):
-        logger.warning(f"NaN values found in {var.value} data")
+    values = np.asarray(data.values)
+    if values.size == 0:
+        return
     
-    if np.any(data < 0):
+    if np.isnan(values).any():
+        logger.warning("NaN values found in %s data", var.value)
+    
+    # fmin/fmax skip NaN, so a single reduction replaces each elementwise compare
+    if np.fmin.reduce(values, axis=None) < 0:
         raise InvalidDataError(f"Negative values found in {var.value} data")
     
     if var in [EnvironmentalVariable.UV, EnvironmentalVariable.PM2P5, EnvironmentalVariable.PM10]:
-        if np.any(data > THRESHOLDS[var]['danger'] * 2):
-            logger.warning(f"Extreme values (>2x danger threshold) found in {var.value} data")
+        if np.fmax.reduce(values, axis=None) > THRESHOLDS[var]['danger'] * 2:
+            logger.warning("Extreme values (>2x danger threshold) found in %s data", var.value)
 
 def calculate_hazard_fraction(value: float, safe: float, danger: float) -> float:
     """
@@ -343,18 +416,28 @@ def calculate_hazard_fraction(value: float, safe: float, danger: float) -> float
     """
     return max(0.0, min(1.0, (value - safe) / (danger - safe)))
 
-def calculate_sub_score(hazard_fraction: float, curve: str = 'linear', sensitivity: float = 1.0) -> int:
+def calculate_sub_score(
+    hazard_fraction: Union[float, np.ndarray],
+    curve: str = 'linear',
+    sensitivity: float = 1.0
+) -> Union[int, np.ndarray]:
     """
     Convert hazard fraction to 1-10 sub-score.
     
     Args:
-        hazard_fraction: The calculated hazard fraction
+        hazard_fraction: The calculated hazard fraction, or an array of them
         curve: The curve type ('linear' or 'logistic')
         sensitivity: The sensitivity adjustment factor
         
     Returns:
-        int: Score between 1 and 10
+        Union[int, np.ndarray]: Score between 1 and 10, element-wise for arrays
     """
+    if isinstance(hazard_fraction, np.ndarray):
+        if curve == 'logistic':
+            hazard_fraction = 1/(1 + np.exp(-12*(hazard_fraction-0.5)))
+        hazard_fraction = hazard_fraction**sensitivity
+        return np.rint(1 + 9*hazard_fraction).astype(int)
+    
     if curve == 'logistic':
         hazard_fraction = 1/(1 + math.exp(-12*(hazard_fraction-0.5)))
     hazard_fraction = hazard_fraction**sensitivity
@@ -370,18 +453,82 @@ def calculate_pollen_score(pollen_values: Dict[EnvironmentalVariable, float]) ->
     Returns:
         int: Combined pollen score between 1 and 10
     """
-    hazard_fractions = {
-        name: calculate_hazard_fraction(value, THRESHOLDS[name]['safe'], THRESHOLDS[name]['danger'])
-        for name, value in pollen_values.items()
-    }
+    present = np.array([p in pollen_values for p in POLLEN_ORDER])
+    values = np.array([pollen_values.get(p, 0.0) for p in POLLEN_ORDER], dtype=np.float64)
+    hazards = np.fmax(0.0, np.fmin(1.0, (values - POLLEN_SAFE) / (POLLEN_DANGER - POLLEN_SAFE)))
     
-    group_hazards = {}
-    for group, members in POLLEN_GROUPS.items():
-        group_hazards[group] = max(hazard_fractions.get(member, 0) for member in members)
+    group_hazards = np.maximum.reduceat(np.where(present, hazards, 0.0), POLLEN_GROUP_SEGMENTS)
     
-    total_fraction = 1 - math.prod(1 - H for H in group_hazards.values())
+    total_fraction = 1 - np.prod(1 - group_hazards)
     return int(round(1 + 9*total_fraction))
 
+def _moving_mean(values: np.ndarray, hours: int) -> np.ndarray:
+    """
+    Trailing moving mean over the given number of hourly values.
+    
+    Only complete windows are returned, so the result is aligned with the
+    input from index hours-1 on. Windows containing a NaN are NaN.
+    
+    Args:
+        values: Hourly values, at least hours of them
+        hours: Averaging period in hours
+        
+    Returns:
+        np.ndarray: Smoothed values, one per complete window
+    """
+    if hours == 1:
+        return values
+    
+    # Window sums as differences of a float64 running total, so the cost does
+    # not grow with the window length; NaNs are counted separately so they
+    # only poison the windows that contain them
+    nan = np.isnan(values)
+    totals = np.concatenate(([0.0], np.cumsum(np.where(nan, 0.0, values), dtype=np.float64)))
+    nan_counts = np.concatenate(([0], np.cumsum(nan)))
+    
+    smoothed = (totals[hours:] - totals[:-hours]) / hours
+    smoothed[nan_counts[hours:] > nan_counts[:-hours]] = np.nan
+    return smoothed
+
+def _exceedance_runs(
+    values: np.ndarray,
+    times_ns: np.ndarray,
+    threshold: float,
+    min_duration: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find runs of consecutive values above threshold.
+    
+    A run starts at its first exceeding time and ends at the first time back
+    at or below the threshold, or at the last time if the series ends inside
+    the run. NaN values never exceed the threshold. Only plain NumPy arrays
+    go in and out, so no Python objects are created per timestep.
+    
+    Args:
+        values: Values to scan, aligned with times_ns
+        times_ns: Timestamps as int64 nanoseconds
+        threshold: The threshold value
+        min_duration: Minimum duration in hours for a run to be kept
+        
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Start indices, end indices
+        and maximum value of each kept run
+    """
+    mask = values > threshold
+    if not mask.any():
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0, dtype=values.dtype)
+    
+    # Rising and falling edges of the mask delimit the runs [start, stop)
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], mask, [False])).view(np.int8)))
+    starts, stops = edges[0::2], edges[1::2]
+    ends = np.minimum(stops, len(values) - 1)
+    
+    maxes = np.maximum.reduceat(np.where(mask, values, -np.inf), starts)
+    keep = (times_ns[ends] - times_ns[starts]) // NS_PER_HOUR >= min_duration
+    
+    return starts[keep], ends[keep], maxes[keep]
+
 def detect_peak_periods(
     data: xr.DataArray,
     var: EnvironmentalVariable,
@@ -403,108 +550,26 @@ def detect_peak_periods(
     try:
         validate_data(data, var)
     except DataError as e:
-        logger.error(f"Data validation failed for {var.value}: {str(e)}")
+        logger.error("Data validation failed for %s: %s", var.value, e)
         return []
     
     windows = []
     
     if var in VARIABLE_TIMING:
-        timing = VARIABLE_TIMING[var]
+        hours = WINDOW_HOURS.get(VARIABLE_TIMING[var]['window'])
+        if hours is None or len(data.time) < hours:
+            return windows
         
-        if timing['window'] == 'instant':
-            # For instant measurements
-            high_hours = data > threshold
-            in_window = False
-            window_start = None
-            window_max = 0
-            
-            for time, value in zip(data.time.values, data.values):
-                if high_hours.sel(time=time) and not in_window:
-                    in_window = True
-                    window_start = time
-                    window_max = value
-                elif high_hours.sel(time=time) and in_window:
-                    window_max = max(window_max, value)
-                elif not high_hours.sel(time=time) and in_window:
-                    if (time - window_start).astype('timedelta64[h]').astype(int) >= min_duration:
-                        windows.append(TimeWindow(
-                            start=window_start,
-                            end=time,
-                            value=window_max
-                        ))
-                    in_window = False
-            
-            if in_window:
-                if (data.time.values[-1] - window_start).astype('timedelta64[h]').astype(int) >= min_duration:
-                    windows.append(TimeWindow(
-                        start=window_start,
-                        end=data.time.values[-1],
-                        value=window_max
-                    ))
-            
-        elif timing['window'] == '8h':
-            # For 8-hour rolling windows (O3)
-            rolling = data.rolling(time=8).mean()
-            high_hours = rolling > threshold
-            in_window = False
-            window_start = None
-            window_max = 0
-            
-            for time, value in zip(rolling.time.values, rolling.values):
-                if high_hours.sel(time=time) and not in_window:
-                    in_window = True
-                    window_start = time
-                    window_max = value
-                elif high_hours.sel(time=time) and in_window:
-                    window_max = max(window_max, value)
-                elif not high_hours.sel(time=time) and in_window:
-                    if (time - window_start).astype('timedelta64[h]').astype(int) >= min_duration:
-                        windows.append(TimeWindow(
-                            start=window_start,
-                            end=time,
-                            value=window_max
-                        ))
-                    in_window = False
-            
-            if in_window:
-                if (rolling.time.values[-1] - window_start).astype('timedelta64[h]').astype(int) >= min_duration:
-                    windows.append(TimeWindow(
-                        start=window_start,
-                        end=rolling.time.values[-1],
-                        value=window_max
-                    ))
-            
-        elif timing['window'] == '24h':
-            # For 24-hour rolling windows (PM2.5, PM10)
-            rolling = data.rolling(time=24).mean()
-            high_hours = rolling > threshold
-            in_window = False
-            window_start = None
-            window_max = 0
-            
-            for time, value in zip(rolling.time.values, rolling.values):
-                if high_hours.sel(time=time) and not in_window:
-                    in_window = True
-                    window_start = time
-                    window_max = value
-                elif high_hours.sel(time=time) and in_window:
-                    window_max = max(window_max, value)
-                elif not high_hours.sel(time=time) and in_window:
-                    if (time - window_start).astype('timedelta64[h]').astype(int) >= min_duration:
-                        windows.append(TimeWindow(
-                            start=window_start,
-                            end=time,
-                            value=window_max
-                        ))
-                    in_window = False
-            
-            if in_window:
-                if (rolling.time.values[-1] - window_start).astype('timedelta64[h]').astype(int) >= min_duration:
-                    windows.append(TimeWindow(
-                        start=window_start,
-                        end=rolling.time.values[-1],
-                        value=window_max
-                    ))
+        # Hours before the first complete window can never exceed the threshold
+        values = _moving_mean(data.values, hours)
+        times = data.time.values[hours - 1:]
+        starts, ends, maxes = _exceedance_runs(
+            values, times.astype('datetime64[ns]').view(np.int64), threshold, min_duration
+        )
+        windows = [
+            TimeWindow(start=times[start], end=times[end], value=value)
+            for start, end, value in zip(starts, ends, maxes)
+        ]
     
     return windows
 
@@ -526,97 +591,227 @@ def calculate_risk_windows(
         return detect_peak_periods(data, var, VARIABLE_TIMING[var]['alert_threshold'])
     return []
 
-def calculate_profile_risk(
-    profile: HealthProfile,
-    environmental_data: Dict[EnvironmentalVariable, xr.DataArray],
-    sensitivity: Optional[float] = None
-) -> RiskAssessment:
+def summarize_environmental_data(
+    environmental_data: Dict[EnvironmentalVariable, xr.DataArray]
+) -> Dict[EnvironmentalVariable, float]:
     """
-    Calculate risk score for a health profile.
+    Validate each variable once and compute its mean.
     
     Args:
-        profile: The health profile to assess
         environmental_data: Dictionary of environmental variables to their data
-        sensitivity: Optional sensitivity override (default: None)
         
     Returns:
-        RiskAssessment: The calculated risk assessment
+        Dict[EnvironmentalVariable, float]: Mean value of every variable that
+        passed validation
+    """
+    means = {}
+    for var, data in environmental_data.items():
+        try:
+            validate_data(data, var)
+        except DataError as e:
+            logger.error("Error processing %s: %s", var.value, e)
+            continue
         
-    Raises:
-        MissingDataError: If required data is missing
+        # Reduce the raw buffer directly; like DataArray.mean this skips NaN,
+        # and an all-NaN variable (already reported by validate_data) gives NaN
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            means[var] = float(np.nanmean(data.values))
+    return means
+
+def _pack_means(
+    means: Dict[EnvironmentalVariable, float]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
-    sub_scores = {}
-    missing_variables = []
-    extreme_events = {}
-    beyond_scale = False
+    Pack per-variable means into arrays ordered like ALL_VARIABLES.
     
-    # Calculate sub-scores for each driver
-    for var, weight in HEALTH_PROFILES[profile].weights.items():
-        if var in environmental_data:
-            try:
-                data = environmental_data[var]
-                validate_data(data, var)
-                value = float(data.mean())
-                
-                # Check for extreme events
-                if value > THRESHOLDS[var]['danger'] * 1.5:
-                    beyond_scale = True
-                    extreme_events[var] = value
-                    value = THRESHOLDS[var]['danger']  # Cap at danger threshold
-                
-                # Special handling for pollen
-                if var in [p for group in POLLEN_GROUPS.values() for p in group]:
-                    pollen_values = {var: value}
-                    sub_scores[var] = calculate_pollen_score(pollen_values)
-                else:
-                    hazard = calculate_hazard_fraction(value, THRESHOLDS[var]['safe'], THRESHOLDS[var]['danger'])
-                    # For asthma child, use more conservative thresholds
-                    if profile == HealthProfile.ASTHMA_CHILD:
-                        hazard = hazard * 1.2  # Increase hazard by 20% for children
-                    sub_scores[var] = calculate_sub_score(hazard)
-                
-            except DataError as e:
-                logger.error(f"Error processing {var.value}: {str(e)}")
-                missing_variables.append(var)
-                sub_scores[var] = 1  # Default to lowest risk
-        else:
-            missing_variables.append(var)
-            sub_scores[var] = 1  # Default to lowest risk
+    Args:
+        means: Output of summarize_environmental_data
+        
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Means capped at the danger
+        threshold, availability mask and extreme-event mask
+    """
+    available = np.array([var in means for var in ALL_VARIABLES])
+    packed = np.array([means.get(var, np.nan) for var in ALL_VARIABLES], dtype=np.float64)
+    
+    # Check for extreme events and cap them at the danger threshold
+    extreme = available & (packed > DANGER * 1.5)
+    packed = np.where(extreme, DANGER, packed)
+    
+    return packed, available, extreme
+
+def _score_profiles(
+    table: _ProfileTable,
+    packed_means: np.ndarray,
+    available: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Score the drivers of one profile table, or of all stacked profiles at once.
+    
+    Args:
+        table: A single-profile table or _ALL_PROFILES_TABLE
+        packed_means: Capped means from _pack_means
+        available: Availability mask from _pack_means
+        
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Driver presence mask,
+        sub-scores and unrounded weighted final score(s)
+    """
+    present = available[table.var_idx] & table.is_driver
+    
+    # The gather returns a copy, so the hazard fractions are computed in place
+    # in it; fmin/fmax treat a NaN mean as fully hazardous, like
+    # calculate_hazard_fraction does
+    hazard = packed_means[table.var_idx]
+    hazard -= table.safe
+    hazard /= table.span
+    np.fmin(hazard, 1.0, out=hazard)
+    np.fmax(hazard, 0.0, out=hazard)
+    hazard *= table.hazard_scale
+    # Pollen goes through the cross-reactivity combination of calculate_pollen_score
+    hazard[table.is_pollen] = 1 - (1 - hazard[table.is_pollen])
+    
+    scores = calculate_sub_score(hazard)
+    scores[~present] = 1  # Default to lowest risk
+    
+    # Padding has zero weight and sits after the real drivers, so the sum
+    # runs in the same order as the profile's weights
+    finals = (table.weights * scores).sum(axis=-1)
+    return present, scores, finals
+
+def _build_assessment(
+    profile: HealthProfile,
+    present: np.ndarray,
+    scores: np.ndarray,
+    final: float,
+    extreme: np.ndarray,
+    means: Dict[EnvironmentalVariable, float],
+    risk_windows: Dict[EnvironmentalVariable, List[TimeWindow]]
+) -> RiskAssessment:
+    """Assemble a RiskAssessment from one profile's row of _score_profiles output."""
+    variables = _PROFILE_VARIABLES[profile]
+    scores = scores[:len(variables)]
+    missing_variables = [var for var, ok in zip(variables, present) if not ok]
+    extreme_events = {var: means[var] for var in variables if extreme[_VARIABLE_INDEX[var]]}
+    sub_scores = {var: int(score) for var, score in zip(variables, scores)}
     
     # Calculate confidence based on missing data
     confidence = 1.0
     if missing_variables:
-        required_vars = set(HEALTH_PROFILES[profile].weights.keys())
-        missing_ratio = len(missing_variables) / len(required_vars)
+        missing_ratio = len(missing_variables) / len(variables)
         confidence = 1.0 - (missing_ratio * 0.5)  # Reduce confidence by up to 50%
     
     # Calculate final score
-    final_score = round(sum(w * sub_scores[d] for d, w in HEALTH_PROFILES[profile].weights.items()))
+    final_score = int(round(float(final)))
     
     # Dominant-pollutant override
-    if any(score >= 9 for score in sub_scores.values()):
-        final_score = max(sub_scores.values())
+    if (scores >= 9).any():
+        final_score = int(scores.max())
     
     # Find top contributor
-    top_contributor = max(sub_scores.items(), key=lambda x: x[1])
-    
-    # Calculate risk windows
-    risk_windows = {}
-    for var in environmental_data:
-        if var in VARIABLE_TIMING:
-            risk_windows[var] = calculate_risk_windows(environmental_data[var], var)
+    top_var = variables[int(np.argmax(scores))]
+    top_contributor = (top_var, sub_scores[top_var])
     
     return RiskAssessment(
         final_score=final_score,
         sub_scores=sub_scores,
         top_contributor=top_contributor,
-        beyond_scale=beyond_scale,
+        beyond_scale=bool(extreme_events),
         confidence=confidence,
         risk_windows=risk_windows,
         missing_variables=missing_variables,
         extreme_events=extreme_events
     )
 
+def calculate_all_risk_windows(
+    environmental_data: Dict[EnvironmentalVariable, xr.DataArray]
+) -> Dict[EnvironmentalVariable, List[TimeWindow]]:
+    """
+    Calculate risk windows for every variable with timing information.
+    
+    Args:
+        environmental_data: Dictionary of environmental variables to their data
+        
+    Returns:
+        Dict[EnvironmentalVariable, List[TimeWindow]]: Risk windows per variable
+    """
+    return {
+        var: calculate_risk_windows(data, var)
+        for var, data in environmental_data.items()
+        if var in VARIABLE_TIMING
+    }
+
+def calculate_profile_risk(
+    profile: HealthProfile,
+    environmental_data: Dict[EnvironmentalVariable, xr.DataArray],
+    sensitivity: Optional[float] = None,
+    precomputed_means: Optional[Dict[EnvironmentalVariable, float]] = None,
+    risk_windows: Optional[Dict[EnvironmentalVariable, List[TimeWindow]]] = None
+) -> RiskAssessment:
+    """
+    Calculate risk score for a health profile.
+    
+    Args:
+        profile: The health profile to assess
+        environmental_data: Dictionary of environmental variables to their data
+        sensitivity: Optional sensitivity override (default: None)
+        precomputed_means: Optional output of summarize_environmental_data, to
+            share validation and means across profiles
+        risk_windows: Optional output of calculate_all_risk_windows
+        
+    Returns:
+        RiskAssessment: The calculated risk assessment
+        
+    Raises:
+        MissingDataError: If required data is missing
+    """
+    if precomputed_means is None:
+        precomputed_means = summarize_environmental_data({
+            var: environmental_data[var]
+            for var in _PROFILE_VARIABLES[profile]
+            if var in environmental_data
+        })
+    if risk_windows is None:
+        risk_windows = calculate_all_risk_windows(environmental_data)
+    
+    packed_means, available, extreme = _pack_means(precomputed_means)
+    present, scores, final = _score_profiles(_PROFILE_TABLES[profile], packed_means, available)
+    return _build_assessment(
+        profile, present, scores, final, extreme, precomputed_means, risk_windows
+    )
+
+def assess_all_profiles(
+    environmental_data: Dict[EnvironmentalVariable, xr.DataArray]
+) -> Dict[HealthProfile, RiskAssessment]:
+    """
+    Calculate risk assessments for every health profile.
+    
+    Validation, means and risk windows do not depend on the profile, so they
+    are computed once, and all profiles are scored in one batched sweep.
+    
+    Args:
+        environmental_data: Dictionary of environmental variables to their data
+        
+    Returns:
+        Dict[HealthProfile, RiskAssessment]: Risk assessment per profile
+    """
+    means = summarize_environmental_data(environmental_data)
+    risk_windows = calculate_all_risk_windows(environmental_data)
+    
+    packed_means, available, extreme = _pack_means(means)
+    present, scores, finals = _score_profiles(_ALL_PROFILES_TABLE, packed_means, available)
+    return {
+        profile: _build_assessment(
+            profile, present[i], scores[i], finals[i], extreme, means, risk_windows
+        )
+        for i, profile in enumerate(PROFILE_ORDER)
+    }
+
+def _read_dataarray(file_path: Path) -> xr.DataArray:
+    """Open a single-variable raster and read it into memory."""
+    return xr.open_dataarray(file_path).load()
+
 def load_environmental_data(date: str) -> Dict[EnvironmentalVariable, xr.DataArray]:
     """
     Load all environmental data for a given date.
@@ -631,19 +826,21 @@ def load_environmental_data(date: str) -> Dict[EnvironmentalVariable, xr.DataArr
         MissingDataError: If no data could be loaded
     """
     data_dir = Path('data')
+    paths = {var: data_dir / f"{date}_{var.value}.tif" for var in EnvironmentalVariable}
     data = {}
     
-    for var in EnvironmentalVariable:
-        if var == EnvironmentalVariable.UV:
-            file_path = data_dir / f"{date}_{var.value}.tif"
-        else:
-            file_path = data_dir / f"{date}_{var.value}.tif"
-        
-        if file_path.exists():
+    # Reads are I/O-bound and independent, so overlap them
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = {
+            var: executor.submit(_read_dataarray, file_path)
+            for var, file_path in paths.items()
+            if file_path.exists()
+        }
+        for var, future in futures.items():
             try:
-                data[var] = xr.open_dataarray(file_path)
+                data[var] = future.result()
             except Exception as e:
-                logger.error(f"Error loading {var.value} data: {str(e)}")
+                logger.error("Error loading %s data: %s", var.value, e)
     
     if not data:
         raise MissingDataError(f"No environmental data found for date {date}")
@@ -652,14 +849,15 @@ def load_environmental_data(date: str) -> Dict[EnvironmentalVariable, xr.DataArr
 
 def main():
     """Main function to demonstrate risk calculation."""
+    logging.basicConfig(level=logging.INFO)
     try:
         date = "2025-06-05"  # Use today's date
         environmental_data = load_environmental_data(date)
         
         # Calculate risk for each profile
-        for profile in HealthProfile:
+        assessments = assess_all_profiles(environmental_data)
+        for profile, risk_assessment in assessments.items():
             try:
-                risk_assessment = calculate_profile_risk(profile, environmental_data)
                 print(f"\nRisk assessment for {profile.value}:")
                 print(f"Overall risk score: {risk_assessment.final_score}")
                 print(f"Confidence: {risk_assessment.confidence:.1%}")
@@ -687,11 +885,11 @@ def main():
                             print(f"    {window.start} to {window.end} (value: {window.value:.1f})")
             
             except Exception as e:
-                logger.error(f"Error calculating risk for {profile.value}: {str(e)}")
+                logger.error("Error calculating risk for %s: %s", profile.value, e)
                 continue
     
     except Exception as e:
-        logger.error(f"Error in main function: {str(e)}")
+        logger.error("Error in main function: %s", e)
         raise
 
 if __name__ == "__main__":
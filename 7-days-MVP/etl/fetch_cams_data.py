@@ -4,10 +4,19 @@ Fetch CAMS air quality, pollen, and UVI data and save to raw/ directory.
 This script downloads forecast data as NetCDF and GRIB for selected variables and times.
 """
 
+import argparse
+import hashlib
+import json
+import random
+import tempfile
+import threading
+import time
 import cdsapi
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
 from dotenv import load_dotenv
+import requests
 import xarray as xr
 
 # Load .env for local development
@@ -16,6 +25,16 @@ load_dotenv()
 RAW_DIR = Path(__file__).parent.parent / "raw"
 RAW_DIR.mkdir(parents=True, exist_ok=True)
 
+# Shared by both forecast datasets: the 00:00 run, with leadtime_hour giving the other times
+LEADTIME_HOURS = tuple(str(hour) for hour in (
+    0, 8, 12, 16, 20,
+    24, 32, 36, 40, 44,
+    48, 56, 60, 64, 68,
+    72, 80, 84, 88, 92, 96
+))
+TIMES_00 = ("00:00",)
+TYPE_FORECAST = ("forecast",)
+
 # CAMS Air Quality Forecasts
 CAMS_AIR_QUALITY_DATASET = "cams-europe-air-quality-forecasts"
 CAMS_AIR_QUALITY_VARIABLES = [
@@ -32,108 +51,206 @@ CAMS_AIR_QUALITY_VARIABLES = [
     "sulphur_dioxide"
 ]
 CAMS_AIR_QUALITY_MODEL = ["ensemble"]
-CAMS_AIR_QUALITY_TIMES = ["00:00"]  # Only 00:00 as we use leadtime_hour for other times
-CAMS_AIR_QUALITY_LEADTIME_HOUR = [
-    "0", "8", "12", "16", "20",
-    "24", "32", "36", "40", "44",
-    "48", "56", "60", "64", "68",
-    "72", "80", "84", "88", "92", "96"
-]
-CAMS_AIR_QUALITY_TYPE = ["forecast"]
 CAMS_AIR_QUALITY_LEVEL = ["0"] # metres above surface
 CAMS_AIR_QUALITY_AREA = [53, 13, 52, 14]  # North, West, South, East
 
 # CAMS Atmospheric Composition Forecasts
 CAMS_ATMOS_COMPOSITION_DATASET = "cams-global-atmospheric-composition-forecasts"
 CAMS_ATMOS_COMPOSITION_VARIABLE = ["uv_biologically_effective_dose"]
-CAMS_ATMOS_COMPOSITION_TIMES = ["00:00"]  # Only 00:00 as we use leadtime_hour for other times
-CAMS_ATMOS_COMPOSITION_LEADTIME_HOUR = [
-    "0", "8", "12", "16", "20",
-    "24", "32", "36", "40", "44",
-    "48", "56", "60", "64", "68",
-    "72", "80", "84", "88", "92", "96"
-]
-CAMS_ATMOS_COMPOSITION_TYPE = ["forecast"]
 CAMS_ATMOS_COMPOSITION_AREA = [53, 13, 52, 14]  # North, West, South, East
+# Surface pressure over the Berlin box stays within ~30 hPa of 1000 hPa all year,
+# so the closest available pressure level never changes
+CAMS_ATMOS_COMPOSITION_PRESSURE_LEVEL = 1000
 
-def fetch_cams_air_quality_data(date):
-    c = cdsapi.Client()
-    date_str = date.strftime('%Y-%m-%d')
-    request = {
-        "variable": CAMS_AIR_QUALITY_VARIABLES,
+# Request template per dataset; build_request() adds the date and any per-request fields
+CAMS_SCHEMA = {
+    CAMS_AIR_QUALITY_DATASET: {
         "model": CAMS_AIR_QUALITY_MODEL,
-        "date": [f"{date_str}/{date_str}"],
-        "time": CAMS_AIR_QUALITY_TIMES,
-        "leadtime_hour": CAMS_AIR_QUALITY_LEADTIME_HOUR,
-        "type": CAMS_AIR_QUALITY_TYPE,
+        "time": TIMES_00,
+        "leadtime_hour": LEADTIME_HOURS,
+        "type": TYPE_FORECAST,
         "level": CAMS_AIR_QUALITY_LEVEL,
-        "data_format": "netcdf_zip",  # Changed back to netcdf_zip format
+        "data_format": "netcdf",
         "area": CAMS_AIR_QUALITY_AREA
+    },
+    CAMS_ATMOS_COMPOSITION_DATASET: {
+        "variable": CAMS_ATMOS_COMPOSITION_VARIABLE,
+        "time": TIMES_00,
+        "leadtime_hour": LEADTIME_HOURS,
+        "type": TYPE_FORECAST,
+        "pressure_level": [str(CAMS_ATMOS_COMPOSITION_PRESSURE_LEVEL)],
+        "data_format": "grib",
+        "area": CAMS_ATMOS_COMPOSITION_AREA
     }
-    target_file = RAW_DIR / f"{date_str}_cams_air_quality.nc.zip"  # Changed file extension to match format
-    print(f"Requesting CAMS Air Quality data for {date_str}...")
-    c.retrieve(CAMS_AIR_QUALITY_DATASET, request, str(target_file))
+}
+
+# Retries for transient CDS failures: attempt n waits about RETRY_BASE_DELAY**n seconds,
+# stretched while other downloads are failing too, plus random jitter so that
+# parallel workers do not retry in lockstep
+RETRY_ATTEMPTS = 6
+RETRY_BASE_DELAY = 2.0
+RETRY_JITTER = (0, 1)
+CONGESTION_FACTOR = 4
+
+# Moving average of recent retrieve failures, shared by all download threads
+_failure_rate = 0.0
+_failure_lock = threading.Lock()
+# CDS requests in flight at once
+DOWNLOAD_WORKERS = 4
+# One CDS client per download thread, see thread_client()
+_thread_clients = threading.local()
+
+def record_outcome(failed):
+    global _failure_rate
+    with _failure_lock:
+        _failure_rate = 0.8 * _failure_rate + 0.2 * failed
+
+def is_transient(error):
+    if isinstance(error, requests.HTTPError):
+        # Client errors other than rate limiting will fail again
+        status = error.response.status_code if error.response is not None else None
+        return status is None or status == 429 or status >= 500
+    return isinstance(error, (
+        requests.ConnectionError, requests.Timeout, ConnectionError, TimeoutError
+    ))
+
+def build_request(dataset, date, **fields):
+    date_str = date.strftime('%Y-%m-%d')
+    return {**CAMS_SCHEMA[dataset], "date": [f"{date_str}/{date_str}"], **fields}
+
+def request_digest(dataset, request):
+    return hashlib.sha256(json.dumps([dataset, request], sort_keys=True).encode()).hexdigest()
+
+def retrieve(c, dataset, request, target_file):
+    # Skip requests already downloaded; a sidecar file records which request produced the target
+    digest_file = target_file.with_name(target_file.name + '.sha256')
+    digest = request_digest(dataset, request)
+    if (target_file.exists() and target_file.stat().st_size > 0
+            and digest_file.exists() and digest_file.read_text() == digest):
+        print(f"{target_file.name} is up to date, skipping download")
+        return
+    
+    for attempt in range(1, RETRY_ATTEMPTS + 1):
+        try:
+            c.retrieve(dataset, request, str(target_file))
+        except Exception as e:
+            record_outcome(True)
+            if attempt == RETRY_ATTEMPTS or not is_transient(e):
+                raise
+            delay = RETRY_BASE_DELAY**attempt * (1 + CONGESTION_FACTOR * _failure_rate)
+            delay += random.uniform(*RETRY_JITTER)
+            print(f"Request for {target_file.name} failed ({e}), retrying in {delay:.0f}s...")
+            time.sleep(delay)
+        else:
+            record_outcome(False)
+            digest_file.write_text(digest)
+            return
+
+def air_quality_tasks(date):
+    # One request per variable: CDS queues each request as a single job, so
+    # splitting lets a slow variable run alongside the others
+    date_str = date.strftime('%Y-%m-%d')
+    tasks = []
+    for variable in CAMS_AIR_QUALITY_VARIABLES:
+        request = build_request(CAMS_AIR_QUALITY_DATASET, date, variable=[variable])
+        target_file = RAW_DIR / f"{date_str}_cams_{variable}.nc"
+        tasks.append((CAMS_AIR_QUALITY_DATASET, request, target_file))
+    return tasks
+
+def air_quality_file(date):
+    return RAW_DIR / f"{date.strftime('%Y-%m-%d')}_cams_air_quality.nc"
+
+def combine_air_quality_data(date):
+    # Merge the per-variable downloads into the single file the grid step reads.
+    # Only rebuild it when a download is newer, so its timestamp stays stable.
+    target_file = air_quality_file(date)
+    variable_files = [task[2] for task in air_quality_tasks(date)]
+    if target_file.exists() and all(
+        f.stat().st_mtime <= target_file.stat().st_mtime for f in variable_files
+    ):
+        return target_file
+
+    datasets = []
+    for variable_file in variable_files:
+        # Keep the raw encoding (fill values, packing) so it is written back unchanged
+        with xr.open_dataset(variable_file, decode_cf=False) as ds:
+            datasets.append(ds.load())
+
+    combined = xr.merge(datasets, combine_attrs='override')
+    # Write next to the target and swap it in, so readers never see a partial file
+    with tempfile.NamedTemporaryFile(dir=RAW_DIR, suffix='.nc', delete=False) as tmp:
+        tmp_file = Path(tmp.name)
+    combined.to_netcdf(tmp_file, encoding={name: {'_FillValue': None} for name in combined.coords})
+    tmp_file.replace(target_file)
+    return target_file
+
+def fetch_cams_air_quality_data(date, client=None):
+    c = client or thread_client()
+    print(f"Requesting CAMS Air Quality data for {date.strftime('%Y-%m-%d')}...")
+    for dataset, request, target_file in air_quality_tasks(date):
+        retrieve(c, dataset, request, target_file)
+    target_file = combine_air_quality_data(date)
     print(f"Saved CAMS Air Quality data to {target_file}")
 
-def fetch_cams_atmos_composition_data(date):
-    c = cdsapi.Client()
+def fetch_cams_atmos_composition_data(date, client=None):
+    c = client or thread_client()
     date_str = date.strftime('%Y-%m-%d')
 
-    # First, retrieve the surface pressure for Berlin
-    surface_pressure_request = {
-        "variable": ["surface_pressure"],
-        "date": [f"{date_str}/{date_str}"],
-        "time": CAMS_ATMOS_COMPOSITION_TIMES,
-        "leadtime_hour": CAMS_ATMOS_COMPOSITION_LEADTIME_HOUR,
-        "type": CAMS_ATMOS_COMPOSITION_TYPE,
-        "data_format": "grib",
-        "area": CAMS_ATMOS_COMPOSITION_AREA
-    }
-    surface_pressure_file = RAW_DIR / f"{date_str}_cams_surface_pressure.grib"
-    print(f"Requesting CAMS Global surface pressure data for {date_str}...")
-    c.retrieve(CAMS_ATMOS_COMPOSITION_DATASET, surface_pressure_request, str(surface_pressure_file))
-    print(f"Saved CAMS Global surface pressure data to {surface_pressure_file}")
-
-    # Open the surface pressure file and get the pressure value for Berlin
-    ds = xr.open_dataset(surface_pressure_file, engine='cfgrib')
-    # The surface pressure is in Pa, convert to hPa by dividing by 100
-    surface_pressure = ds['sp'].isel(step=0).values[0, 0] / 100.0  # Convert from Pa to hPa
-    ds.close()
-
-    # Clean up temporary surface pressure files
-    surface_pressure_file.unlink()  # Delete the .grib file
-    idx_file = surface_pressure_file.with_suffix('.grib.5b7b6.idx')
-    if idx_file.exists():
-        idx_file.unlink()  # Delete the .idx file if it exists
-
-    # Determine the appropriate pressure level to use
-    # We want to use the pressure level closest to the surface pressure
-    pressure_levels = [1000, 950, 925, 900, 850, 800, 700, 600, 500, 400, 300, 250, 200, 150, 100, 70, 50, 30, 20, 10, 7, 5, 3, 2, 1]
-    closest_pressure_level = min(pressure_levels, key=lambda x: abs(x - surface_pressure))
-    print(f"Using pressure level {closest_pressure_level} hPa (closest to surface pressure {surface_pressure:.2f} hPa)")
-
-    # Now, retrieve the UVI data using the determined pressure level
-    uvi_request = {
-        "variable": CAMS_ATMOS_COMPOSITION_VARIABLE,
-        "date": [f"{date_str}/{date_str}"],
-        "time": CAMS_ATMOS_COMPOSITION_TIMES,
-        "leadtime_hour": CAMS_ATMOS_COMPOSITION_LEADTIME_HOUR,
-        "type": CAMS_ATMOS_COMPOSITION_TYPE,
-        "pressure_level": [str(closest_pressure_level)],
-        "data_format": "grib",
-        "area": CAMS_ATMOS_COMPOSITION_AREA
-    }
+    # Retrieve the UVI data at the pressure level closest to the surface
+    uvi_request = build_request(CAMS_ATMOS_COMPOSITION_DATASET, date)
     uvi_file = RAW_DIR / f"{date_str}_cams_atmos_composition.grib"
     print(f"Requesting CAMS Atmospheric Composition data for {date_str}...")
-    c.retrieve(CAMS_ATMOS_COMPOSITION_DATASET, uvi_request, str(uvi_file))
+    retrieve(c, CAMS_ATMOS_COMPOSITION_DATASET, uvi_request, uvi_file)
     print(f"Saved CAMS Atmospheric Composition data to {uvi_file}")
 
-def main():
-    today = datetime.utcnow().date()
-    # Fetch today's forecast, which includes predictions for the next 4 days
-    fetch_cams_air_quality_data(today)
+def thread_client():
+    # A client's HTTP session is not meant to be shared across threads, so each
+    # thread keeps its own and reuses its kept-alive connections for every task
+    client = getattr(_thread_clients, 'client', None)
+    if client is None:
+        client = _thread_clients.client = cdsapi.Client()
+    return client
+
+def download_task(dataset, request, target_file):
+    retrieve(thread_client(), dataset, request, target_file)
+
+def download_all(tasks, max_workers=DOWNLOAD_WORKERS):
+    # Each task is a (dataset, request, target_file) tuple. CDS requests spend most
+    # of their time queued server-side, so overlap them; the workers only sleep
+    # between status polls, so they are cheap to add for long backfills
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(download_task, dataset, request, target_file): target_file
+            for dataset, request, target_file in tasks
+        }
+        for future in as_completed(futures):
+            future.result()
+            print(f"Saved {futures[future]}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        'dates',
+        nargs='*',
+        type=lambda value: datetime.strptime(value, '%Y-%m-%d').date(),
+        help="Forecast dates to fetch (YYYY-MM-DD, default: today)"
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=DOWNLOAD_WORKERS,
+        help=f"Number of CDS requests in flight at once (default: {DOWNLOAD_WORKERS})"
+    )
+    args = parser.parse_args(argv)
+    dates = args.dates or [datetime.utcnow().date()]
+    
+    # Each day's forecast includes predictions for the next 4 days
+    print(f"Requesting CAMS Air Quality data for {', '.join(str(date) for date in dates)}...")
+    download_all([task for date in dates for task in air_quality_tasks(date)], args.workers)
+    for date in dates:
+        print(f"Saved CAMS Air Quality data to {combine_air_quality_data(date)}")
     # Temporarily comment out UVI data fetching due to API issues
-    # fetch_cams_atmos_composition_data(today)
+    # fetch_cams_atmos_composition_data(date)
     print("Successfully fetched CAMS forecast data!")
 
 if __name__ == "__main__":
@@ -1,4 +1,6 @@
-import xarray as xr
+import os
+import rioxarray
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
@@ -13,21 +15,42 @@ variables = [
 date = datetime.utcnow().strftime("%Y-%m-%d")
 data_dir = Path("7-days-MVP/data")
 
-for var in variables:
-    file_path = data_dir / f"{date}_{var}.tif"
-    print(f"\n--- {var} ---")
-    if not file_path.exists():
-        print(f"File not found: {file_path}")
-        continue
-    try:
-        da = xr.open_dataarray(file_path)
-        print(f"Shape: {da.shape}")
-        print(f"Dimensions: {da.dims}")
-        print(f"Coordinates: {list(da.coords)}")
+
+def describe_raster(file_path):
+    """Open one raster and collect its summary, reading only a small sample."""
+    # Opened lazily and without the global GDAL lock, so the threads read in parallel
+    with rioxarray.open_rasterio(file_path, lock=False) as da:
+        lines = [
+            f"Shape: {da.shape}",
+            f"Dimensions: {da.dims}",
+            f"Coordinates: {list(da.coords)}",
+        ]
         # Print band values if present
         if "band" in da.coords:
-            print(f"Band values: {da['band'].values}")
-        # Print a small sample of the data
-        print("Sample data:", da.values.ravel()[:5])
-    except Exception as e:
-        print(f"Error loading {file_path}: {e}") 
\ No newline at end of file
+            lines.append(f"Band values: {da['band'].values}")
+        # Print a small sample of the data; only the window holding it is read
+        sample = da.head({**{dim: 1 for dim in da.dims[:-1]}, da.dims[-1]: 5})
+        lines.append(f"Sample data: {sample.values.ravel()}")
+    return lines
+
+
+paths = {var: data_dir / f"{date}_{var}.tif" for var in variables}
+# List the directory once instead of checking every file separately
+present = {entry.name for entry in os.scandir(data_dir) if entry.is_file()} if data_dir.is_dir() else set()
+existing = {var: path for var, path in paths.items() if path.name in present}
+
+# Open all rasters concurrently; results are printed in variable order
+with ThreadPoolExecutor(max_workers=len(existing) or 1) as pool:
+    futures = {var: pool.submit(describe_raster, path) for var, path in existing.items()}
+
+    for var in variables:
+        file_path = paths[var]
+        print(f"\n--- {var} ---")
+        if var not in futures:
+            print(f"File not found: {file_path}")
+            continue
+        try:
+            for line in futures[var].result():
+                print(line)
+        except Exception as e:
+            print(f"Error loading {file_path}: {e}")
@@ -2,6 +2,7 @@ import xarray as xr
 import numpy as np
 from datetime import datetime, timedelta
 import json
+import os
 from typing import Dict, List, Tuple
 import logging
 from dataclasses import dataclass
@@ -19,76 +20,126 @@ class UserProfile:
     alert_threshold: float  # 1-10 scale
     notification_preferences: Dict[str, bool]  # e.g., {"email": True, "push": True}
 
+POLLEN_VARIABLES = ['birch_pollen', 'grass_pollen', 'olive_pollen', 'ragweed_pollen']
+# The frontend shows the last ALERTS_KEPT alerts; the append-only log is
+# compacted back down to them once it grows past ALERTS_COMPACT_AT lines
+ALERTS_KEPT = 10
+ALERTS_COMPACT_AT = 100
+# Closing advice of an alert message, per severity
+ALERT_ADVICE = {
+    "high": "Consider staying indoors or taking extra precautions.",
+    "moderate": "Take normal precautions for your activities.",
+    "low": "Conditions are generally safe for your profile.",
+}
+
 class AlertProcessor:
     def __init__(self, data_dir: str = "data"):
         self.data_dir = Path(data_dir)
         self.UV_MAX = 11
         self.POLLEN_MAX = 100
+        # Latest-time grids, reused across users until the data stores change
+        self._grids_key = None
+        self._grids = None
         
     def load_data(self) -> Tuple[xr.Dataset, xr.Dataset]:
-        """Load UV and pollen data from NetCDF files."""
+        """Load UV and pollen data from Zarr stores."""
         try:
-            uv_ds = xr.open_dataset(self.data_dir / "uv_berlin.nc")
-            pollen_ds = xr.open_dataset(self.data_dir / "pollen_berlin.nc")
+            # Consolidated metadata is a single read; data chunks load on access
+            uv_ds = xr.open_dataset(self.data_dir / "uv_berlin.zarr", engine='zarr', consolidated=True)
+            pollen_ds = xr.open_dataset(self.data_dir / "pollen_berlin.zarr", engine='zarr', consolidated=True)
             return uv_ds, pollen_ds
         except Exception as e:
             logger.error(f"Error loading data: {e}")
             raise
 
+    def load_grids(self) -> Tuple[xr.DataArray, xr.DataArray, xr.DataArray, xr.DataArray]:
+        """Return the latest UV and total pollen grids, raw and normalized.
+
+        They do not depend on the user, so they are computed once and reused
+        until either store is rewritten.
+        """
+        key = tuple(
+            (self.data_dir / name).stat().st_mtime_ns
+            for name in ("uv_berlin.zarr", "pollen_berlin.zarr")
+        )
+        if key != self._grids_key:
+            uv_ds, pollen_ds = self.load_data()
+            with uv_ds, pollen_ds:
+                # Get the latest time step by position, then match pollen to it
+                uv_grid = uv_ds['uv_index'].isel(time=-1).load()
+                latest_time = uv_grid.time.values
+                # Select and sum the pollen types in one pass
+                pollen_grid = pollen_ds[POLLEN_VARIABLES].sel(time=latest_time).to_array().sum('variable', skipna=False)
+            self._grids = (uv_grid, pollen_grid, uv_grid / self.UV_MAX, pollen_grid / self.POLLEN_MAX)
+            self._grids_key = key
+        return self._grids
+
     def calculate_risk_score(self, 
                            uv_data: xr.DataArray, 
                            pollen_data: xr.DataArray,
-                           user_profile: UserProfile) -> float:
-        """Calculate personalized risk score based on user profile."""
+                           user_profile: UserProfile) -> xr.DataArray:
+        """Calculate personalized risk scores based on user profile.
+
+        Works on whole grids at once; the result has the shape of the inputs.
+        """
         # Normalize the data
         uv_norm = uv_data / self.UV_MAX
         pollen_norm = pollen_data / self.POLLEN_MAX
-        
+        return self.combine_risk_score(uv_norm, pollen_norm, user_profile)
+
+    def combine_risk_score(self,
+                           uv_norm: xr.DataArray,
+                           pollen_norm: xr.DataArray,
+                           user_profile: UserProfile) -> xr.DataArray:
+        """Calculate personalized risk scores from already normalized data."""
         # Calculate weighted risk score
         risk_score = (
             uv_norm * user_profile.uv_sensitivity + 
             pollen_norm * user_profile.pollen_sensitivity
         ) / (user_profile.uv_sensitivity + user_profile.pollen_sensitivity) * 10
         
-        return float(risk_score.clip(1, 10))
+        return risk_score.clip(1, 10)
+
+    @staticmethod
+    def select_location(data: xr.DataArray, location: Tuple[float, float]) -> xr.DataArray:
+        """Select the grid cell nearest to a (latitude, longitude) location."""
+        latitude, longitude = location
+        point = {
+            dim: value for dim, value in (('latitude', latitude), ('longitude', longitude))
+            if dim in data.dims
+        }
+        return data.sel(point, method='nearest') if point else data
 
     def should_send_alert(self, risk_score: float, user_profile: UserProfile) -> bool:
         """Determine if an alert should be sent based on risk score and user threshold."""
         return risk_score >= user_profile.alert_threshold
 
+    @staticmethod
+    def severity(risk_score: float) -> str:
+        """Severity level of a risk score: "high", "moderate" or "low"."""
+        return "high" if risk_score >= 8 else "moderate" if risk_score >= 5 else "low"
+
     def generate_alert_message(self, risk_score: float, uv_value: float, pollen_value: float) -> str:
         """Generate a human-readable alert message."""
-        severity = "High" if risk_score >= 8 else "Moderate" if risk_score >= 5 else "Low"
-        
-        message = f"⚠️ {severity} Risk Alert ⚠️\n\n"
-        message += f"Current Risk Score: {risk_score:.1f}/10\n"
-        message += f"UV Index: {uv_value:.1f}\n"
-        message += f"Pollen Level: {pollen_value:.1f}\n\n"
-        
-        if risk_score >= 8:
-            message += "Consider staying indoors or taking extra precautions."
-        elif risk_score >= 5:
-            message += "Take normal precautions for your activities."
-        else:
-            message += "Conditions are generally safe for your profile."
-            
-        return message
+        severity = self.severity(risk_score)
+        return (
+            f"⚠️ {severity.capitalize()} Risk Alert ⚠️\n\n"
+            f"Current Risk Score: {risk_score:.1f}/10\n"
+            f"UV Index: {uv_value:.1f}\n"
+            f"Pollen Level: {pollen_value:.1f}\n\n"
+            f"{ALERT_ADVICE[severity]}"
+        )
 
     def process_alerts(self, user_profile: UserProfile) -> List[Dict]:
         """Process data and generate alerts for a user."""
         try:
-            uv_ds, pollen_ds = self.load_data()
-            
-            # Get the latest time step
-            latest_time = uv_ds.time[-1]
-            
-            # Get data for user's location
-            uv_data = uv_ds['uv_index'].sel(time=latest_time)
-            pollen_data = sum([pollen_ds[var].sel(time=latest_time) 
-                             for var in ['birch_pollen', 'grass_pollen', 'olive_pollen', 'ragweed_pollen']])
+            uv_grid, pollen_grid, uv_norm, pollen_norm = self.load_grids()
             
-            # Calculate risk score
-            risk_score = self.calculate_risk_score(uv_data, pollen_data, user_profile)
+            # Calculate risk scores over the whole grid, then pick the user's location
+            risk_grid = self.combine_risk_score(uv_norm, pollen_norm, user_profile)
+            risk_score = float(self.select_location(risk_grid, user_profile.location))
+            uv_data = self.select_location(uv_grid, user_profile.location)
+            pollen_data = self.select_location(pollen_grid, user_profile.location)
             
             alerts = []
             if self.should_send_alert(risk_score, user_profile):
@@ -98,7 +149,7 @@ class AlertProcessor:
                     "uv_value": float(uv_data),
                     "pollen_value": float(pollen_data),
                     "message": self.generate_alert_message(risk_score, float(uv_data), float(pollen_data)),
-                    "severity": "high" if risk_score >= 8 else "moderate" if risk_score >= 5 else "low"
+                    "severity": self.severity(risk_score)
                 }
                 alerts.append(alert)
                 
@@ -112,25 +163,25 @@ class AlertProcessor:
             raise
 
     def save_alert(self, alert: Dict):
-        """Save alert to a JSON file for the frontend to consume."""
-        alerts_file = self.data_dir / "alerts.json"
+        """Append alert to a JSON Lines file for the frontend to consume."""
+        alerts_file = self.data_dir / "alerts.jsonl"
         
-        # Load existing alerts
-        if alerts_file.exists():
-            with open(alerts_file, 'r') as f:
-                alerts = json.load(f)
-        else:
-            alerts = []
+        # Append the new alert as one line
+        with open(alerts_file, 'a') as f:
+            f.write(json.dumps(alert, separators=(',', ':')) + '\n')
         
-        # Add new alert
-        alerts.append(alert)
+        # Count lines without decoding the file
+        with open(alerts_file, 'rb') as f:
+            line_count = f.read().count(b'\n')
         
-        # Keep only last 10 alerts
-        alerts = alerts[-10:]
-        
-        # Save updated alerts
-        with open(alerts_file, 'w') as f:
-            json.dump(alerts, f, indent=2)
+        # Keep only the last alerts once the file has grown enough
+        if line_count > ALERTS_COMPACT_AT:
+            with open(alerts_file, 'r') as f:
+                lines = f.readlines()[-ALERTS_KEPT:]
+            tmp_file = alerts_file.with_suffix('.jsonl.tmp')
+            with open(tmp_file, 'w') as f:
+                f.writelines(lines)
+            os.replace(tmp_file, alerts_file)
 
 def main():
     # Example usage
@@ -97,9 +97,14 @@ const AlertDisplay: React.FC = () => {
   useEffect(() => {
     const fetchAlerts = async () => {
       try {
-        const response = await fetch('/data/alerts.json');
-        const data = await response.json();
-        setAlerts(data);
+        const response = await fetch('/data/alerts.jsonl');
+        const text = await response.text();
+        // One alert per line; only the most recent ones are shown
+        const data: Alert[] = text
+          .split('\n')
+          .filter((line) => line.trim())
+          .map((line) => JSON.parse(line));
+        setAlerts(data.slice(-10));
       } catch (error) {
         console.error('Error fetching alerts:', error);
       } finally {
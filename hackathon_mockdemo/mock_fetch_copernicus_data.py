@@ -1,6 +1,10 @@
 import cdsapi
+import xarray as xr
+from numcodecs import Blosc
 from datetime import datetime, timedelta
+from pathlib import Path
 import os
+import shutil
 
 # Berlin bounding box: [North, West, South, East]
 BERLIN_AREA = [53.5, 12.0, 51.5, 14.5]
@@ -9,6 +13,30 @@ BERLIN_AREA = [53.5, 12.0, 51.5, 14.5]
 start_date = datetime.now().strftime('%Y-%m-%d')
 end_date = (datetime.now() + timedelta(days=6)).strftime('%Y-%m-%d')
 
+def convert_to_zarr(nc_path):
+    """Convert a downloaded NetCDF file to a Zarr store next to it, once.
+
+    Each time step is its own zstd-compressed chunk, so reading the latest
+    forecast only decompresses that step.
+    """
+    nc_path = Path(nc_path)
+    store_path = nc_path.with_suffix('.zarr')
+    tmp_path = nc_path.with_suffix('.zarr.tmp')
+    compressor = Blosc(cname='zstd', clevel=3, shuffle=Blosc.SHUFFLE)
+    with xr.open_dataset(nc_path) as ds:
+        encoding = {
+            var: {
+                'compressor': compressor,
+                'chunks': tuple(1 if dim == 'time' else size for dim, size in zip(ds[var].dims, ds[var].shape)),
+            }
+            for var in ds.data_vars
+        }
+        ds.to_zarr(tmp_path, mode='w', encoding=encoding, consolidated=True)
+    # Swap the finished store in so readers never see a partial one
+    shutil.rmtree(store_path, ignore_errors=True)
+    tmp_path.rename(store_path)
+    print(f'Converted {nc_path} to {store_path}')
+
 os.makedirs('data', exist_ok=True)
 c = cdsapi.Client()
 
@@ -29,6 +57,7 @@ c.retrieve(
     },
     'data/uv_berlin.nc')
 print('UV index data saved to data/uv_berlin.nc')
+convert_to_zarr('data/uv_berlin.nc')
 
 # Fetch Pollen (CAMS European air quality forecasts)
 # Available pollen variables: birch, grass, olive, ragweed (as of 2024)
@@ -53,4 +82,5 @@ c.retrieve(
         'area': BERLIN_AREA,
     },
     'data/pollen_berlin.nc')
-print('Pollen data saved to data/pollen_berlin.nc') 
\ No newline at end of file
+print('Pollen data saved to data/pollen_berlin.nc')
+convert_to_zarr('data/pollen_berlin.nc')
@@ -1,110 +1,175 @@
-import streamlit as st
-
-# Claudia-specific thresholds and weights
-CLAUDIA_THRESHOLDS = {
-    'PM2.5': [(8, 2), (20, 0), (float('inf'), -2)],
-    'PM10': [(15, 2), (35, 0), (float('inf'), -2)],
-    'O3': [(20, 2), (60, 0), (float('inf'), -2)],
-    'NO2': [(15, 2), (40, 0), (float('inf'), -2)],
-    'SO2': [(2, 2), (6, 0), (float('inf'), -2)],
-    'Pollen': [(50, 2), (150, 0), (float('inf'), -2)],
-    'Mold': [(500, 2), (3000, 0), (float('inf'), -2)],
-    'UV': [(2, 2), (4, 0), (6, -1), (float('inf'), -2)],
-    'Sunshine': [(1800, 2), (2500, 0), (float('inf'), -2)],
-    'Humidity': [(40, -2), (50, 2), (65, 0), (float('inf'), -2)],
-    'Temperature': [(14, 0), (18, 2), (25, 0), (float('inf'), -2)],
-    'Pressure': [(1010, 0), (1020, 2), (1030, 1), (float('inf'), -2)],
-}
-
-CLAUDIA_WEIGHTS = {
-    'PM2.5': 2,
-    'PM10': 2,
-    'O3': 2,
-    'NO2': 2,
-    'SO2': 1,
-    'Pollen': 1,
-    'Mold': 3,
-    'UV': 3,
-    'Sunshine': 2,
-    'Humidity': 4,
-    'Temperature': 2,
-    'Pressure': 3,
-}
-
-# Risk scoring logic
-def get_score(value, thresholds):
-    for limit, score in thresholds:
-        if value <= limit:
-            return score
-    return thresholds[-1][1]
-
-def compute_risk(inputs):
-    total = 0
-    max_score = 0
-    for factor, value in inputs.items():
-        score = get_score(value, CLAUDIA_THRESHOLDS[factor])
-        weight = CLAUDIA_WEIGHTS.get(factor, 1)
-        total += score * weight
-        max_score += 2 * weight  # Max score per factor (if score is 2)
-    risk_score = 10 - ((total / max_score) * 10)
-    return round(min(max(risk_score, 0), 10), 2)
-
-# Streamlit config
-st.set_page_config(page_title="Claudia's Health Risk Evaluator", layout="centered")
-
-# Sidebar controls
-with st.sidebar:
-    st.markdown("### ℹ️ Instructions")
-    st.markdown("Adjust environmental values below to estimate Claudia’s health risk.")
-    st.markdown("**Score Range:** 0 = Low Risk, 10 = High Risk")
-    st.markdown("### 🧪 Environmental Inputs")
-
-    inputs = {
-        'PM2.5': st.slider("PM2.5 (µg/m³)", 0, 100, 12),
-        'PM10': st.slider("PM10 (µg/m³)", 0, 100, 20),
-        'O3': st.slider("Ozone O₃ (ppb)", 0, 120, 25),
-        'NO2': st.slider("NO₂ (ppb)", 0, 100, 18),
-        'SO2': st.slider("SO₂ (ppb)", 0, 50, 3),
-        'Pollen': st.slider("Pollen Count (grains/m³)", 0, 500, 75),
-        'Mold': st.slider("Mold Spores (spores/m³)", 0, 20000, 2500),
-        'UV': st.slider("UV Index", 0, 12, 5),
-        'Sunshine': st.slider("Sunshine Hours/year", 0, 4000, 2200),
-        'Humidity': st.slider("Humidity (%)", 0, 100, 55),
-        'Temperature': st.slider("Avg Temperature (°C)", -10, 40, 20),
-        'Pressure': st.slider("Barometric Pressure (hPa)", 950, 1050, 1015),
-    }
-
-# Main content
-st.title("🌿 Claudia's Unique Health Risk Evaluator")
-
-st.markdown("### 🧬 Claudia’s Health Profile")
-st.dataframe({
-    "Health Condition": [
-        "Sun Sensitivity", "Skin Disease", "Arthritis", "Respiratory Condition",
-        "Pollen Allergy", "Mold/Mite Allergy", "Medicines"
-    ],
-    "Sensitivity Level": [
-        "Medium", "High", "Medium", "Low", "Low", "Low", "Medium"
-    ],
-    "Condition": [
-        "Photosensitivity", "Psoriasis", "Possible", "-", "-", "-", "Yes"
-    ],
-    "Related Environmental Factor(s)": [
-        "UV Index, Sunshine", "Humidity, UV, Temp", "Pressure, Humidity, Temp",
-        "PM2.5, PM10, O₃, NO₂, SO₂", "Pollen Count", "Mold, Humidity", "UV exposure"
-    ],
-    "Weight": [3, 4, 2, 2, 1, 1, 1]
-})
-
-# Compute score
-risk_score = compute_risk(inputs)
-
-st.metric(label="🩺 Claudia’s Risk Score", value=f"{risk_score} / 10")
-
-# Result interpretation
-if risk_score <= 3:
-    st.success("✅ Low Risk – This environment is generally safe for Claudia.")
-elif risk_score <= 6:
-    st.warning("⚠️ Moderate Risk – Some environmental factors may need monitoring.")
-else:
-    st.error("🚨 High Risk – This environment may negatively impact Claudia’s health.")
+import math
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Claudia-specific thresholds and weights
+CLAUDIA_THRESHOLDS = {
+    'PM2.5': [(8, 2), (20, 0), (float('inf'), -2)],
+    'PM10': [(15, 2), (35, 0), (float('inf'), -2)],
+    'O3': [(20, 2), (60, 0), (float('inf'), -2)],
+    'NO2': [(15, 2), (40, 0), (float('inf'), -2)],
+    'SO2': [(2, 2), (6, 0), (float('inf'), -2)],
+    'Pollen': [(50, 2), (150, 0), (float('inf'), -2)],
+    'Mold': [(500, 2), (3000, 0), (float('inf'), -2)],
+    'UV': [(2, 2), (4, 0), (6, -1), (float('inf'), -2)],
+    'Sunshine': [(1800, 2), (2500, 0), (float('inf'), -2)],
+    'Humidity': [(40, -2), (50, 2), (65, 0), (float('inf'), -2)],
+    'Temperature': [(14, 0), (18, 2), (25, 0), (float('inf'), -2)],
+    'Pressure': [(1010, 0), (1020, 2), (1030, 1), (float('inf'), -2)],
+}
+
+CLAUDIA_WEIGHTS = {
+    'PM2.5': 2,
+    'PM10': 2,
+    'O3': 2,
+    'NO2': 2,
+    'SO2': 1,
+    'Pollen': 1,
+    'Mold': 3,
+    'UV': 3,
+    'Sunshine': 2,
+    'Humidity': 4,
+    'Temperature': 2,
+    'Pressure': 3,
+}
+
+@dataclass(frozen=True)
+class FactorTable:
+    """Thresholds and weights of every factor as arrays in one fixed factor order."""
+    factors: Tuple[str, ...]
+    limits: np.ndarray  # (factor, bucket) int16, ascending per factor
+    scores: np.ndarray  # (factor, bucket) int8
+    weights: np.ndarray  # (factor,) int8
+    index_of: Dict[str, int]  # row of each factor
+
+def build_factor_table(thresholds, weights):
+    # Every slider range fits in int16, so the open-ended last limit becomes the
+    # int16 maximum; shorter tables are padded with that limit repeating their last score
+    factors = tuple(thresholds)
+    width = max(len(table) for table in thresholds.values())
+    open_limit = np.iinfo(np.int16).max
+    limits = np.array([
+        [min(limit, open_limit) for limit, _ in thresholds[factor]] + [open_limit] * (width - len(thresholds[factor]))
+        for factor in factors
+    ], dtype=np.int16)
+    # Counting the limits below a value only finds its bucket if they ascend
+    assert (np.diff(limits, axis=1) >= 0).all(), "threshold limits must be ascending"
+    scores = np.array([
+        [score for _, score in thresholds[factor]] + [thresholds[factor][-1][1]] * (width - len(thresholds[factor]))
+        for factor in factors
+    ], dtype=np.int8)
+    return FactorTable(
+        factors=factors,
+        limits=limits,
+        scores=scores,
+        weights=np.array([weights[factor] for factor in factors], dtype=np.int8),
+        index_of={factor: i for i, factor in enumerate(factors)},
+    )
+
+FACTOR_TABLE = build_factor_table(CLAUDIA_THRESHOLDS, CLAUDIA_WEIGHTS)
+_MAX_SCORE = 2 * int(FACTOR_TABLE.weights.sum())  # Max score per factor is 2
+_SCALE = 10.0 / _MAX_SCORE
+
+# Slider label, range and default per factor
+SLIDER_SPECS = {
+    'PM2.5': ("PM2.5 (µg/m³)", 0, 100, 12),
+    'PM10': ("PM10 (µg/m³)", 0, 100, 20),
+    'O3': ("Ozone O₃ (ppb)", 0, 120, 25),
+    'NO2': ("NO₂ (ppb)", 0, 100, 18),
+    'SO2': ("SO₂ (ppb)", 0, 50, 3),
+    'Pollen': ("Pollen Count (grains/m³)", 0, 500, 75),
+    'Mold': ("Mold Spores (spores/m³)", 0, 20000, 2500),
+    'UV': ("UV Index", 0, 12, 5),
+    'Sunshine': ("Sunshine Hours/year", 0, 4000, 2200),
+    'Humidity': ("Humidity (%)", 0, 100, 55),
+    'Temperature': ("Avg Temperature (°C)", -10, 40, 20),
+    'Pressure': ("Barometric Pressure (hPa)", 950, 1050, 1015),
+}
+
+# Result interpretation per whole risk score, rounded up: up to 3 is low risk,
+# up to 6 moderate and anything above high
+_LOW_RISK = ("success", "✅ Low Risk – This environment is generally safe for Claudia.")
+_MODERATE_RISK = ("warning", "⚠️ Moderate Risk – Some environmental factors may need monitoring.")
+_HIGH_RISK = ("error", "🚨 High Risk – This environment may negatively impact Claudia’s health.")
+RESULT_MESSAGES = (_LOW_RISK,) * 4 + (_MODERATE_RISK,) * 3 + (_HIGH_RISK,) * 4
+
+# Risk scoring logic. Sliders have integer steps, so configurations repeat often
+# as the user drags back and forth; Streamlit's cache outlives the script reruns,
+# unlike lru_cache
+@st.cache_data(max_entries=4096)
+def compute_risk(values):
+    # values holds one integer slider value per factor, in FACTOR_TABLE order;
+    # every slider range fits in int16 like the limits it is compared against
+    table = FACTOR_TABLE
+    values = np.array(values, dtype=np.int16)
+    # A factor's score is that of the first limit not below its value,
+    # i.e. the number of limits below it
+    idx = (values[:, None] > table.limits).sum(axis=1)
+    scores = table.scores[np.arange(len(table.factors)), idx]
+    total = int((scores * table.weights).sum())
+    risk_score = 10.0 - total * _SCALE
+    return round(min(max(risk_score, 0), 10), 2)
+
+# The health profile is constant, so build it once and hand the same DataFrame
+# to every rerun (cache_data would return a fresh copy each time); it is shared,
+# so it must not be modified
+@st.cache_resource
+def health_profile():
+    return pd.DataFrame({
+        "Health Condition": [
+            "Sun Sensitivity", "Skin Disease", "Arthritis", "Respiratory Condition",
+            "Pollen Allergy", "Mold/Mite Allergy", "Medicines"
+        ],
+        "Sensitivity Level": [
+            "Medium", "High", "Medium", "Low", "Low", "Low", "Medium"
+        ],
+        "Condition": [
+            "Photosensitivity", "Psoriasis", "Possible", "-", "-", "-", "Yes"
+        ],
+        "Related Environmental Factor(s)": [
+            "UV Index, Sunshine", "Humidity, UV, Temp", "Pressure, Humidity, Temp",
+            "PM2.5, PM10, O₃, NO₂, SO₂", "Pollen Count", "Mold, Humidity", "UV exposure"
+        ],
+        "Weight": [3, 4, 2, 2, 1, 1, 1]
+    })
+
+# Streamlit config
+st.set_page_config(page_title="Claudia's Health Risk Evaluator", layout="centered")
+
+# Sidebar controls
+with st.sidebar:
+    st.markdown(
+        "### ℹ️ Instructions\n\n"
+        "Adjust environmental values below and press **Evaluate** to estimate Claudia’s health risk.\n\n"
+        "**Score Range:** 0 = Low Risk, 10 = High Risk\n\n"
+        "### 🧪 Environmental Inputs"
+    )
+
+    # Sliders only rerun the app when the form is submitted, not on every drag
+    with st.form("inputs_form"):
+        values = tuple(st.slider(*SLIDER_SPECS[factor]) for factor in FACTOR_TABLE.factors)
+        st.form_submit_button("Evaluate")
+
+# Main content
+st.title("🌿 Claudia's Unique Health Risk Evaluator")
+
+st.markdown("### 🧬 Claudia’s Health Profile")
+st.table(health_profile())
+
+# Compute score, reusing the last result when the same values are resubmitted
+last = st.session_state.get("last_risk")
+if last is not None and last[0] == values:
+    risk_score = last[1]
+else:
+    risk_score = compute_risk(values)
+    st.session_state["last_risk"] = (values, risk_score)
+
+st.metric(label="🩺 Claudia’s Risk Score", value=f"{risk_score} / 10")
+
+# Result interpretation
+kind, message = RESULT_MESSAGES[math.ceil(risk_score)]
+getattr(st, kind)(message)